@@ -1,82 +1,99 @@
 import pandas as pd
 import numpy as np
 
+from data_io import load_csv
 
-def analyze_menu_popularity(sales_data, prepared_data):
+# 時間帯ごとの重み付け（早い時間帯の販売をより重視）
+# コード順：オープン直後は2倍重視、2番目は1.5倍、通常、最後は半分
+TIME_WEIGHTS = np.array([2.0, 1.5, 1.0, 0.5])
+
+# 時間帯のカテゴリ型（コードで重み配列を引けるよう順序を固定する）
+SLOT_TYPE = pd.CategoricalDtype(
+    ['11:00-11:30', '11:30-12:00', '12:00-12:30', '12:30-13:00'],
+    ordered=True
+)
+
+
+def analyze_menu_popularity(sales_data, prepared_data, engine=None):
     """
     日替わりメニューの人気度を分析する関数
 
     Parameters:
     sales_data: 販売データのDataFrame（時間帯ごとの販売数）
     prepared_data: 作成数データのDataFrame（日ごとの作成数）
+    engine: 'numba'を指定するとgroupby集計をnumbaでJITコンパイルして並列実行する
+            （データが小さいうちはコンパイル時間の方が高くつくので既定はCython）
     """
 
-    # 時間帯ごとの重み付け（早い時間帯の販売をより重視）
-    time_weights = {
-        '11:00-11:30': 2.0,  # オープン直後は2倍重視
-        '11:30-12:00': 1.5,  # 2番目の時間帯は1.5倍
-        '12:00-12:30': 1.0,  # 通常の重み
-        '12:30-13:00': 0.5  # 最後の時間帯は半分の重み
-    }
-
-    # 分析結果を格納するリスト
-    results = []
-
-    # 日付ごとに分析を行う
-    for date in sales_data['date'].unique():
-        # その日のデータを抽出
-        menu_data = sales_data[sales_data['date'] == date]
-        prepared = prepared_data[prepared_data['date'] == date].iloc[0]
-
-        # メニュー名と作成数を取得
-        menu_name = prepared['menu_name']
-        total_prepared = prepared['prepared_amount']
-
-        # 時間帯ごとのスコアを計算
-        time_scores = []  # 時間帯別スコアを格納するリスト
-        early_sales = 0  # 前半（11:00-12:00）の販売数
-        total_sales = 0  # 総販売数
-
-        # 各時間帯のデータを処理
-        for idx, row in menu_data.iterrows():
-            # その時間帯での日替わりメニューのシェアを計算
-            # 例）日替わり30個/全体75個 = 40%
-            share = row['daily_special_sales'] / row['total_sales'] * 100
-
-            # シェアに時間帯の重みを掛ける
-            # 例）40% × 2.0 = 80点（11:00-11:30の場合）
-            weighted_score = share * time_weights[row['time_slot']]
-            time_scores.append(weighted_score)
-
-            # 前半（11:00-12:00）の販売数を集計
-            if row['time_slot'] in ['11:00-11:30', '11:30-12:00']:
-                early_sales += row['daily_special_sales']
-
-            # 総販売数を集計
-            total_sales += row['daily_special_sales']
-
-        # 各種スコアの計算
-        time_score = np.mean(time_scores)  # 時間帯スコアの平均
-        sales_rate = (total_sales / total_prepared) * 100  # 総販売率
-        early_sales_rate = (early_sales / total_prepared) * 100  # 前半販売率
-
-        # 最終スコアの計算（時間帯シェア60%、総販売率40%）
-        final_score = (time_score * 0.6 + sales_rate * 0.4) / 100
-
-        # 結果を辞書形式で保存
-        results.append({
-            'date': date,
-            'menu_name': menu_name,
-            'prepared_amount': total_prepared,  # 作成数
-            'total_sales': total_sales,  # 総販売数
-            'sales_rate': round(sales_rate, 2),  # 総販売率
-            'early_sales_rate': round(early_sales_rate, 2),  # 前半販売率
-            'time_weighted_score': round(time_score, 2),  # 時間帯スコア
-            'final_score': round(final_score, 2)  # 最終スコア
-        })
+    # 時間帯をカテゴリ型に変換し、コードで重み配列を引く
+    # （行ごとの文字列ハッシュをなくし、連続したfloat演算にする）
+    slot_codes = sales_data['time_slot'].astype(SLOT_TYPE).cat.codes.to_numpy()
+
+    # 前半（11:00-12:00）の販売数は、ブール係数を掛けた列として用意しておく
+    # （コード0,1が前半の時間帯。行ごとのif分岐をなくし、集計を1回にまとめる）
+    # 数値列はnumpy配列に変換しておく（Arrow拡張配列のままだとnumexprが使えない）
+    daily_sales = sales_data['daily_special_sales'].to_numpy()
+    early_contrib = daily_sales * (slot_codes < 2)
+
+    work = pd.DataFrame({
+        'date': sales_data['date'],
+        'daily_special_sales': daily_sales,
+        'all_sales': sales_data['total_sales'].to_numpy(),
+        'w': TIME_WEIGHTS[slot_codes],
+        'early_contrib': early_contrib
+    })
+
+    # 各時間帯でのシェアと重み付きスコアを全行まとめて計算
+    # 例）日替わり30個/全体75個 = 40% → 40% × 2.0 = 80点（11:00-11:30の場合）
+    # evalならnumexprが式全体を1パスに融合し、中間配列を作らない
+    work.eval('weighted = daily_special_sales / all_sales * 100 * w', inplace=True)
+    # スコア計算はfloat32で十分な精度なので、メモリ帯域を半分にする
+    work['weighted'] = work['weighted'].astype('float32')
+
+    # 3つの集計を1回のgroupbyスイープでまとめて行う
+    grouped = work.groupby('date', sort=False)
+    if engine == 'numba':
+        # numbaエンジンは名前付き集計に対応していないので、列ごとの呼び出しで
+        # JITコンパイルされた並列リダクションを使う
+        engine_kwargs = {'engine': 'numba',
+                         'engine_kwargs': {'parallel': True, 'nogil': True}}
+        time_score = grouped['weighted'].mean(**engine_kwargs)  # 時間帯スコアの平均
+        total_sales = grouped['daily_special_sales'].sum(**engine_kwargs)  # 総販売数
+        early_sales = grouped['early_contrib'].sum(**engine_kwargs)  # 前半の販売数
+    else:
+        agg = grouped.agg(
+            time_score=('weighted', 'mean'),  # 時間帯スコアの平均
+            total_sales=('daily_special_sales', 'sum'),  # 総販売数
+            early_sales=('early_contrib', 'sum')  # 前半の販売数
+        )
+        time_score = agg['time_score']
+        total_sales = agg['total_sales']
+        early_sales = agg['early_sales']
+
+    # 作成数データを日付で引けるようにして結合
+    prepared = prepared_data.set_index('date').reindex(time_score.index)
+    total_prepared = prepared['prepared_amount']
+
+    # 各種スコアの計算
+    sales_rate = total_sales / total_prepared * 100  # 総販売率
+    early_sales_rate = early_sales / total_prepared * 100  # 前半販売率
 
     # 結果をDataFrame形式で返す
-    return pd.DataFrame(results)
+    results = pd.DataFrame({
+        'date': time_score.index,
+        'menu_name': prepared['menu_name'].to_numpy(),
+        'prepared_amount': total_prepared.to_numpy(),  # 作成数
+        'total_sales': total_sales.to_numpy(),  # 総販売数
+        'sales_rate': sales_rate.to_numpy(),  # 総販売率
+        'early_sales_rate': early_sales_rate.to_numpy(),  # 前半販売率
+        'time_weighted_score': time_score.to_numpy()  # 時間帯スコア
+    })
+    # 最終スコアの計算（時間帯シェア60%、総販売率40%）もevalで1パスにする
+    results.eval('final_score = (time_weighted_score * 0.6 + sales_rate * 0.4) / 100',
+                 inplace=True)
+    # 丸めは最後に対象の列だけまとめて行う
+    return results.round({'sales_rate': 2, 'early_sales_rate': 2,
+                          'time_weighted_score': 2, 'final_score': 2})
 
 
 # 販売パターンを分析する関数
@@ -84,53 +101,135 @@ def analyze_sales_pattern(sales_data):
     """
     メニューごとの販売パターンを分類する関数
     """
-    patterns = {}
+    # 日付×時間帯の販売数テーブルを1回のpivotで作る
+    pivoted = sales_data.pivot_table(
+        index='date', columns='time_slot', values='daily_special_sales',
+        aggfunc='sum', sort=False
+    )
+
+    # 各時間帯の販売数を比較
+    early_sales = pivoted['11:00-11:30'] + pivoted['11:30-12:00']  # 前半（11:00-12:00）
+    late_sales = pivoted['12:00-12:30'] + pivoted['12:30-13:00']  # 後半（12:00-13:00）
+    mid_peak = pivoted['11:30-12:00'] + pivoted['12:00-12:30']  # 中間時間帯
+
+    # パターンの判定（np.selectで全日付を一括分類）
+    conditions = [
+        (early_sales > late_sales) & (early_sales > mid_peak),
+        (mid_peak > early_sales) & (mid_peak > late_sales)
+    ]
+    choices = ["早い時間帯重視", "お昼時重視"]
+    pattern_labels = np.select(conditions, choices, default="後半に強い")
+
+    # 日付ごとのメニュー名とパターンを対応付けて返す
+    menu_names = sales_data.groupby('date', sort=False)['menu_name'].first()
+    menu_names = menu_names.reindex(pivoted.index)
+    # N回の辞書代入ではなく、ベクトル化済み配列のzipから一度で辞書を作る
+    patterns = dict(zip(menu_names.tolist(), pattern_labels.tolist()))
 
-    # 日付ごとに販売パターンを分析
-    for date in sales_data['date'].unique():
-        menu_data = sales_data[sales_data['date'] == date]
-        menu_name = menu_data.iloc[0]['menu_name']
-
-        # 時間帯ごとの販売数をリストにする
-        sales_pattern = []
-        for _, row in menu_data.iterrows():
-            sales_pattern.append(row['daily_special_sales'])
+    return patterns
 
-        # 各時間帯の販売数を比較
-        early_sales = sum(sales_pattern[:2])  # 前半（11:00-12:00）
-        late_sales = sum(sales_pattern[2:])  # 後半（12:00-13:00）
-        mid_peak = sales_pattern[1] + sales_pattern[2]  # 中間時間帯
 
-        # パターンの判定
-        if early_sales > late_sales and early_sales > mid_peak:
-            pattern = "早い時間帯重視"
-        elif mid_peak > early_sales and mid_peak > late_sales:
-            pattern = "お昼時重視"
-        else:
-            pattern = "後半に強い"
+# 人気度とパターンをまとめて分析する関数
+def analyze_all(sales_data, prepared_data):
+    """
+    人気度分析と販売パターン分類を1回の集計でまとめて行う関数
 
-        patterns[menu_name] = pattern
+    analyze_menu_popularityとanalyze_sales_patternを別々に呼ぶと
+    sales_dataを2回走査することになるので、共通のpivotを両方で使い回す
 
-    return patterns
+    Returns:
+    (人気度のDataFrame, パターン分類のdict)のタプル
+    """
+    slot_codes = sales_data['time_slot'].astype(SLOT_TYPE).cat.codes.to_numpy()
+
+    # 日付×時間帯のテーブルを1回のpivotで作り、両方の分析で共有する
+    # 数値列はnumpy配列に変換しておく（Arrow拡張配列のままだとnumexprが使えない）
+    work = pd.DataFrame({
+        'date': sales_data['date'],
+        'slot': slot_codes,
+        'daily_special_sales': sales_data['daily_special_sales'].to_numpy(),
+        'all_sales': sales_data['total_sales'].to_numpy(),
+        'w': TIME_WEIGHTS[slot_codes]
+    })
+
+    # 重み付きスコア（analyze_menu_popularityと同じ計算、evalで式を融合）
+    work.eval('weighted = daily_special_sales / all_sales * 100 * w', inplace=True)
+    work['weighted'] = work['weighted'].astype('float32')
+    pivoted = work.pivot_table(
+        index='date', columns='slot',
+        values=['daily_special_sales', 'weighted'],
+        aggfunc='sum', sort=False
+    )
+    slot_sales = pivoted['daily_special_sales']  # 日付×時間帯の販売数
+    slot_weighted = pivoted['weighted']  # 日付×時間帯の重み付きスコア
+
+    # --- 人気度分析 ---
+    time_score = slot_weighted.mean(axis=1)  # 時間帯スコアの平均
+    total_sales = slot_sales.sum(axis=1)  # 総販売数
+    early_sales = slot_sales[0] + slot_sales[1]  # 前半（11:00-12:00）の販売数
+
+    # 作成数データを日付で引けるようにして結合
+    prepared = prepared_data.set_index('date').reindex(pivoted.index)
+    total_prepared = prepared['prepared_amount']
+
+    sales_rate = total_sales / total_prepared * 100  # 総販売率
+    early_sales_rate = early_sales / total_prepared * 100  # 前半販売率
+
+    # 最終スコアの計算（時間帯シェア60%、総販売率40%）
+    final_score = (time_score * 0.6 + sales_rate * 0.4) / 100
+
+    results = pd.DataFrame({
+        'date': pivoted.index,
+        'menu_name': prepared['menu_name'].to_numpy(),
+        'prepared_amount': total_prepared.to_numpy(),  # 作成数
+        'total_sales': total_sales.to_numpy(),  # 総販売数
+        'sales_rate': sales_rate.to_numpy(),  # 総販売率
+        'early_sales_rate': early_sales_rate.to_numpy(),  # 前半販売率
+        'time_weighted_score': time_score.to_numpy(),  # 時間帯スコア
+        'final_score': final_score.to_numpy()  # 最終スコア
+    })
+    results = results.round({'sales_rate': 2, 'early_sales_rate': 2,
+                             'time_weighted_score': 2, 'final_score': 2})
+
+    # --- 販売パターン分類 ---
+    late_sales = slot_sales[2] + slot_sales[3]  # 後半（12:00-13:00）
+    mid_peak = slot_sales[1] + slot_sales[2]  # 中間時間帯
+
+    conditions = [
+        (early_sales > late_sales) & (early_sales > mid_peak),
+        (mid_peak > early_sales) & (mid_peak > late_sales)
+    ]
+    choices = ["早い時間帯重視", "お昼時重視"]
+    pattern_labels = np.select(conditions, choices, default="後半に強い")
+
+    menu_names = sales_data.groupby('date', sort=False)['menu_name'].first()
+    menu_names = menu_names.reindex(pivoted.index)
+    # N回の辞書代入ではなく、ベクトル化済み配列のzipから一度で辞書を作る
+    patterns = dict(zip(menu_names.tolist(), pattern_labels.tolist()))
+
+    return results, patterns
 
 
 # メイン処理
 if __name__ == "__main__":
-    # CSVファイルの読み込み
-    sales_data = pd.read_csv('sales_data.csv',encoding='utf-8')
-    prepared_data = pd.read_csv('prepared_data.csv',encoding='utf-8')
+    TOP_K = 20  # ランキング表示する上位件数
+
+    # CSVファイルの読み込み（Parquetキャッシュ経由）
+    sales_data = load_csv('sales_data.csv',
+                          dtype={'daily_special_sales': 'int32', 'total_sales': 'int32'})
+    prepared_data = load_csv('prepared_data.csv', dtype={'prepared_amount': 'int32'})
 
-    # 人気度分析の実行
-    results = analyze_menu_popularity(sales_data, prepared_data)
+    # 人気度分析と販売パターン分析をまとめて実行（sales_dataの走査1回分）
+    results, patterns = analyze_all(sales_data, prepared_data)
 
     # 結果の表示
     print("=== メニュー別人気度ランキング（スコア順）===")
-    print(results.sort_values('final_score', ascending=False)[
+    # 上位TOP_K件だけ見るならnlargestの部分ソートで十分
+    print(results.nlargest(TOP_K, 'final_score')[
               ['menu_name', 'final_score', 'sales_rate', 'early_sales_rate']
           ].to_string(index=False))
 
-    # 販売パターンの分析と表示
-    patterns = analyze_sales_pattern(sales_data)
+    # 販売パターンの表示
     print("\n=== 販売パターン分類 ===")
     for menu, pattern in patterns.items():
         print(f"{menu}: {pattern}")
\ No newline at end of file
@@ -0,0 +1,33 @@
+import os
+
+import pandas as pd
+
+
+def load_csv(csv_path, dtype=None):
+    """
+    CSVファイルをParquetキャッシュ経由で読み込む関数
+
+    初回はCSVを読んで同名のParquetファイルに変換して保存する
+    2回目以降はParquet（列指向・dtype保存済み）を読むので、
+    CSVのパースとdtype推論を毎回やり直さずに済む
+
+    どちらの経路もdtype_backend='pyarrow'で読み込むので、
+    menu_nameなどの文字列列はPyObjectの配列ではなく
+    Arrowバッファに載り、メモリもgroupbyのハッシュも軽くなる
+
+    Parameters:
+    csv_path: 読み込むCSVファイルのパス
+    dtype: CSVパース時に指定する列ごとのdtype
+    """
+    parquet_path = os.path.splitext(csv_path)[0] + '.parquet'
+
+    # CSVが更新されていたらキャッシュを作り直す
+    if (not os.path.exists(parquet_path)
+            or os.path.getmtime(parquet_path) < os.path.getmtime(csv_path)):
+        data = pd.read_csv(csv_path, encoding='utf-8', dtype=dtype,
+                           engine='pyarrow', dtype_backend='pyarrow')
+        data.to_parquet(parquet_path, engine='pyarrow')
+        return data
+
+    return pd.read_parquet(parquet_path, engine='pyarrow',
+                           dtype_backend='pyarrow')
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+from numba import njit, prange
+
+from data_io import load_csv
+
+# 時間帯の並び（カーネルはこの4枠固定を前提にしている）
+TIME_SLOTS = ['11:00-11:30', '11:30-12:00', '12:00-12:30', '12:30-13:00']
+
+
+@njit(cache=True, parallel=True, fastmath=True, boundscheck=False)
+def _score_kernel(daily_sales, total_sales):
+    """
+    (日付数, 4)に並べ替えた販売数から各スコアを計算するカーネル
+
+    時間帯は4枠固定なので、内側のループを展開して重み
+    （2.0, 1.5, 1.0, 0.5）を定数として埋め込む
+    シェア×重みの平均は (Σ w_i × d_i/t_i) × 100 / 4 = ×25.0
+    日付ごとに独立なのでprangeでそのまま並列化できる
+    """
+    n_dates = daily_sales.shape[0]
+    time_score = np.empty(n_dates)
+    total = np.empty(n_dates, dtype=np.int64)
+    early = np.empty(n_dates, dtype=np.int64)
+
+    for d in prange(n_dates):
+        time_score[d] = (2.0 * daily_sales[d, 0] / total_sales[d, 0]
+                         + 1.5 * daily_sales[d, 1] / total_sales[d, 1]
+                         + 1.0 * daily_sales[d, 2] / total_sales[d, 2]
+                         + 0.5 * daily_sales[d, 3] / total_sales[d, 3]) * 25.0
+        # 前半（11:00-12:00）は先頭2枠
+        early[d] = daily_sales[d, 0] + daily_sales[d, 1]
+        total[d] = early[d] + daily_sales[d, 2] + daily_sales[d, 3]
+
+    return time_score, total, early
+
+
+def analyze_menu_popularity_numba(sales_data, prepared_data):
+    """
+    日替わりメニューの人気度を分析する関数（numba版）
+    集計の中身を型付きnumpy配列のカーネルに切り出してJITコンパイルする
+
+    Parameters:
+    sales_data: 販売データのDataFrame（時間帯ごとの販売数）
+    prepared_data: 作成数データのDataFrame（日ごとの作成数）
+    """
+    # (日付数, 4)の連続配列に並べ替えてカーネルに渡す
+    pivoted = sales_data.pivot_table(
+        index='date', columns='time_slot',
+        values=['daily_special_sales', 'total_sales'],
+        aggfunc='sum', sort=False
+    )
+    unique_dates = pivoted.index
+    daily = pivoted['daily_special_sales'][TIME_SLOTS].to_numpy(np.int64)
+    total = pivoted['total_sales'][TIME_SLOTS].to_numpy(np.int64)
+
+    time_score, total_sales, early_sales = _score_kernel(daily, total)
+
+    # 作成数データを日付で引けるようにして結合
+    prepared = prepared_data.set_index('date').reindex(unique_dates)
+    total_prepared = prepared['prepared_amount'].to_numpy()
+
+    # 各種スコアの計算
+    sales_rate = total_sales / total_prepared * 100  # 総販売率
+    early_sales_rate = early_sales / total_prepared * 100  # 前半販売率
+
+    # 最終スコアの計算（時間帯シェア60%、総販売率40%）
+    final_score = (time_score * 0.6 + sales_rate * 0.4) / 100
+
+    # 結果をDataFrame形式で返す
+    results = pd.DataFrame({
+        'date': unique_dates,
+        'menu_name': prepared['menu_name'].to_numpy(),
+        'prepared_amount': total_prepared,  # 作成数
+        'total_sales': total_sales,  # 総販売数
+        'sales_rate': sales_rate,  # 総販売率
+        'early_sales_rate': early_sales_rate,  # 前半販売率
+        'time_weighted_score': time_score,  # 時間帯スコア
+        'final_score': final_score  # 最終スコア
+    })
+    return results.round(2)
+
+
+# メイン処理
+if __name__ == "__main__":
+    TOP_K = 20  # ランキング表示する上位件数
+
+    # CSVファイルの読み込み（Parquetキャッシュ経由）
+    sales_data = load_csv('sales_data.csv',
+                          dtype={'daily_special_sales': 'int32', 'total_sales': 'int32'})
+    prepared_data = load_csv('prepared_data.csv', dtype={'prepared_amount': 'int32'})
+
+    # 人気度分析の実行
+    results = analyze_menu_popularity_numba(sales_data, prepared_data)
+
+    # 結果の表示
+    print("=== メニュー別人気度ランキング（スコア順）===")
+    # 上位TOP_K件だけ見るならnlargestの部分ソートで十分
+    print(results.nlargest(TOP_K, 'final_score')[
+              ['menu_name', 'final_score', 'sales_rate', 'early_sales_rate']
+          ].to_string(index=False))
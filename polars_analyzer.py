@@ -0,0 +1,90 @@
+import polars as pl
+
+
+def analyze_menu_popularity_polars(sales_data, prepared_data):
+    """
+    日替わりメニューの人気度を分析する関数（Polars版）
+    遅延評価クエリで集計するため、データが大きくても複数コアで並列実行できる
+
+    Parameters:
+    sales_data: 販売データのLazyFrame（時間帯ごとの販売数）
+    prepared_data: 作成数データのLazyFrame（日ごとの作成数）
+    """
+
+    # 時間帯ごとの重み付け（早い時間帯の販売をより重視）
+    time_weights = {
+        '11:00-11:30': 2.0,  # オープン直後は2倍重視
+        '11:30-12:00': 1.5,  # 2番目の時間帯は1.5倍
+        '12:00-12:30': 1.0,  # 通常の重み
+        '12:30-13:00': 0.5  # 最後の時間帯は半分の重み
+    }
+
+    # 前半（11:00-12:00）とみなす時間帯
+    early_slots = ['11:00-11:30', '11:30-12:00']
+
+    # シェア×時間帯重みのスコア列を追加し、日付ごとに一括集計する
+    results = (
+        sales_data
+        .with_columns(
+            pl.col('time_slot')
+            .replace_strict(time_weights, return_dtype=pl.Float64)
+            .alias('weight')
+        )
+        .with_columns(
+            (pl.col('daily_special_sales') / pl.col('total_sales') * 100
+             * pl.col('weight')).alias('weighted')
+        )
+        .group_by('date', maintain_order=True)
+        .agg([
+            pl.col('weighted').mean().alias('time_weighted_score'),  # 時間帯スコア
+            pl.col('daily_special_sales').sum().alias('total_sales'),  # 総販売数
+            pl.col('daily_special_sales')
+            .filter(pl.col('time_slot').is_in(early_slots))
+            .sum().alias('early_sales')  # 前半の販売数
+        ])
+        # 作成数データと結合して各種レートを計算
+        .join(prepared_data, on='date', how='left')
+        .with_columns([
+            (pl.col('total_sales') / pl.col('prepared_amount') * 100)
+            .alias('sales_rate'),  # 総販売率
+            (pl.col('early_sales') / pl.col('prepared_amount') * 100)
+            .alias('early_sales_rate')  # 前半販売率
+        ])
+        # 最終スコアの計算（時間帯シェア60%、総販売率40%）
+        .with_columns(
+            ((pl.col('time_weighted_score') * 0.6 + pl.col('sales_rate') * 0.4)
+             / 100).alias('final_score')
+        )
+        .select([
+            'date', 'menu_name',
+            pl.col('prepared_amount'),
+            'total_sales',
+            pl.col('sales_rate').round(2),
+            pl.col('early_sales_rate').round(2),
+            pl.col('time_weighted_score').round(2),
+            pl.col('final_score').round(2)
+        ])
+        .collect(engine='streaming')
+    )
+
+    # pandas側の表示・後処理と合わせるため、境界でのみ変換する
+    return results.to_pandas()
+
+
+# メイン処理
+if __name__ == "__main__":
+    TOP_K = 20  # ランキング表示する上位件数
+
+    # CSVファイルの遅延読み込み
+    sales_data = pl.scan_csv('sales_data.csv')
+    prepared_data = pl.scan_csv('prepared_data.csv')
+
+    # 人気度分析の実行
+    results = analyze_menu_popularity_polars(sales_data, prepared_data)
+
+    # 結果の表示
+    print("=== メニュー別人気度ランキング（スコア順）===")
+    # 上位TOP_K件だけ見るならnlargestの部分ソートで十分
+    print(results.nlargest(TOP_K, 'final_score')[
+              ['menu_name', 'final_score', 'sales_rate', 'early_sales_rate']
+          ].to_string(index=False))
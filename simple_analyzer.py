@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
 
+from data_io import load_csv
+
 
 def analyze_menu_popularity_simple(sales_data, prepared_data):
     """
@@ -19,60 +21,77 @@ def analyze_menu_popularity_simple(sales_data, prepared_data):
         '12:30-13:00': 0.5
     }
 
-    results = []
-
-    for date in sales_data['date'].unique():
-        # その日のデータを抽出
-        menu_data = sales_data[sales_data['date'] == date]
-        prepared = prepared_data[prepared_data['date'] == date].iloc[0]
+    # 作成数データを日付で引けるように一度だけインデックス化する
+    # （日付ごとに全行を走査し直すのを避ける）
+    prepared_by_date = prepared_data.set_index('date')
+
+    # 結果はスキーマが決まっているので、辞書のリストではなく
+    # 日付数ぶんの配列を先に確保して添字で書き込む
+    grouped = sales_data.groupby('date', sort=False)
+    n_dates = grouped.ngroups
+    date_out = np.empty(n_dates, dtype=object)
+    menu_name_out = np.empty(n_dates, dtype=object)
+    prepared_out = np.empty(n_dates, dtype='int32')
+    total_sales_out = np.empty(n_dates, dtype='int32')
+    sales_rate_out = np.empty(n_dates, dtype='float64')
+    early_rate_out = np.empty(n_dates, dtype='float64')
+    time_score_out = np.empty(n_dates, dtype='float64')
+    final_score_out = np.empty(n_dates, dtype='float64')
+
+    # groupbyなら1回の走査で日付ごとに分割できる
+    # （日付ごとにブールマスクで全行を再走査しない）
+    for i, (date, menu_data) in enumerate(grouped):
+        prepared = prepared_by_date.loc[date]
 
         menu_name = prepared['menu_name']
         total_prepared = prepared['prepared_amount']
 
-        # 時間帯ごとの販売数の割合を計算
-        time_scores = []
-        early_sales = 0  # 前半（11:00-12:00）の販売数
-        total_sales = 0  # 総販売数
-
         max_possible_per_slot = total_prepared / len(time_weights)  # 理想的な時間帯あたりの販売数
 
-        for idx, row in menu_data.iterrows():
-            # 時間帯ごとの販売数を理想値との比率で評価（100点満点）
-            sales_score = (row['daily_special_sales'] / max_possible_per_slot) * 100
-            # 上限を100点とする
-            sales_score = min(sales_score, 100)
+        # 時間帯ごとの販売数を理想値との比率で評価（100点満点）
+        # 上限の100点は行ごとのmin()ではなくnp.minimumで一括クリップする
+        slot_sales = menu_data['daily_special_sales'].to_numpy()
+        sales_score = np.minimum(slot_sales / max_possible_per_slot * 100, 100.0)
 
-            # スコアに時間帯の重みを掛ける
-            weighted_score = sales_score * time_weights[row['time_slot']]
-            time_scores.append(weighted_score)
+        # スコアに時間帯の重みを掛けて平均する
+        weights = menu_data['time_slot'].map(time_weights).to_numpy()
+        time_score = (sales_score * weights).mean()  # 時間帯スコアの平均
 
-            # 前半の販売数を集計
-            if row['time_slot'] in ['11:00-11:30', '11:30-12:00']:
-                early_sales += row['daily_special_sales']
-
-            # 総販売数を集計
-            total_sales += row['daily_special_sales']
+        # 前半（11:00-12:00）と全体の販売数を集計
+        early_mask = menu_data['time_slot'].isin(['11:00-11:30', '11:30-12:00']).to_numpy()
+        early_sales = slot_sales[early_mask].sum()
+        total_sales = slot_sales.sum()
 
         # 各種スコアの計算
-        time_score = np.mean(time_scores)  # 時間帯スコアの平均
         sales_rate = (total_sales / total_prepared) * 100  # 総販売率
         early_sales_rate = (early_sales / total_prepared) * 100  # 前半販売率
 
         # 最終スコアの計算（時間帯重み60%、総販売率40%）
         final_score = (time_score * 0.6 + sales_rate * 0.4) / 100
 
-        results.append({
-            'date': date,
-            'menu_name': menu_name,
-            'prepared_amount': total_prepared,
-            'total_sales': total_sales,
-            'sales_rate': round(sales_rate, 2),
-            'early_sales_rate': round(early_sales_rate, 2),
-            'time_weighted_score': round(time_score, 2),
-            'final_score': round(final_score, 2)
-        })
-
-    return pd.DataFrame(results)
+        date_out[i] = date
+        menu_name_out[i] = menu_name
+        prepared_out[i] = total_prepared
+        total_sales_out[i] = total_sales
+        sales_rate_out[i] = sales_rate
+        early_rate_out[i] = early_sales_rate
+        time_score_out[i] = time_score
+        final_score_out[i] = final_score
+
+    # dtype既知の配列から一度でDataFrameを組み立てる
+    # 丸めは日付ごとのround()呼び出しではなく、最後に列単位でまとめて行う
+    results = pd.DataFrame({
+        'date': date_out,
+        'menu_name': menu_name_out,
+        'prepared_amount': prepared_out,
+        'total_sales': total_sales_out,
+        'sales_rate': sales_rate_out,
+        'early_sales_rate': early_rate_out,
+        'time_weighted_score': time_score_out,
+        'final_score': final_score_out
+    })
+    return results.round({'sales_rate': 2, 'early_sales_rate': 2,
+                          'time_weighted_score': 2, 'final_score': 2})
 
 
 def analyze_sales_pattern_simple(sales_data):
@@ -81,8 +100,8 @@ def analyze_sales_pattern_simple(sales_data):
     """
     patterns = {}
 
-    for date in sales_data['date'].unique():
-        menu_data = sales_data[sales_data['date'] == date]
+    # こちらも日付ごとの分割はgroupbyの1回走査で済ませる
+    for date, menu_data in sales_data.groupby('date', sort=False):
         menu_name = menu_data.iloc[0]['menu_name']
 
         # 時間帯ごとの販売数を取得
@@ -113,9 +132,12 @@ def analyze_sales_pattern_simple(sales_data):
 
 # メイン処理
 if __name__ == "__main__":
-    # CSVファイルの読み込み
-    sales_data = pd.read_csv('sales_data.csv', encoding='utf-8')
-    prepared_data = pd.read_csv('prepared_data.csv', encoding='utf-8')
+    TOP_K = 20  # ランキング表示する上位件数
+
+    # CSVファイルの読み込み（Parquetキャッシュ経由）
+    sales_data = load_csv('sales_data.csv',
+                          dtype={'daily_special_sales': 'int32', 'total_sales': 'int32'})
+    prepared_data = load_csv('prepared_data.csv', dtype={'prepared_amount': 'int32'})
 
     # 人気度分析の実行
     results = analyze_menu_popularity_simple(sales_data, prepared_data)
@@ -123,7 +145,8 @@ if __name__ == "__main__":
     # 結果の表示
     print("\n=== メニュー別人気度ランキング（スコア順）===")
     display_cols = ['menu_name', 'final_score', 'sales_rate', 'early_sales_rate']
-    print(results.sort_values('final_score', ascending=False)[display_cols].to_string(index=False))
+    # 上位TOP_K件だけ見るならnlargestの部分ソートで十分
+    print(results.nlargest(TOP_K, 'final_score')[display_cols].to_string(index=False))
 
     # 販売パターンの分析と表示
     patterns = analyze_sales_pattern_simple(sales_data)